@@ -29,36 +29,44 @@
 
 import ctypes
 import olympe_deps as od
-import re
 from aenum import Enum
 
 
+def _strip_prefix(name, prefix):
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
 DeviceState = Enum(
     "DeviceState",
     {
-        re.compile("^ARSDK_DEVICE_STATE_").sub("", v): k
+        _strip_prefix(v, "ARSDK_DEVICE_STATE_"): k
         for k, v in od.arsdk_device_state__enumvalues.items()
     },
 )
 
 
-DRONE_DEVICE_TYPE_LIST = []
-SKYCTRL_DEVICE_TYPE_LIST = []
-for name, value in od.__dict__.items():
-    if name == "ARSDK_DEVICE_TYPE_UNKNOWN":
-        continue
-    if name.startswith("ARSDK_DEVICE_TYPE_"):
-        if name.startswith("ARSDK_DEVICE_TYPE_SKYCTRL"):
-            SKYCTRL_DEVICE_TYPE_LIST.append(value)
-        else:
-            DRONE_DEVICE_TYPE_LIST.append(value)
+_DEVICE_TYPE_PREFIX = "ARSDK_DEVICE_TYPE_"
+_DEVICE_TYPES = [
+    (name[len(_DEVICE_TYPE_PREFIX):], value)
+    for name, value in od.__dict__.items()
+    if name.startswith(_DEVICE_TYPE_PREFIX) and name != "ARSDK_DEVICE_TYPE_UNKNOWN"
+]
+SKYCTRL_DEVICE_TYPE_LIST = [
+    value for name, value in _DEVICE_TYPES if name.startswith("SKYCTRL")
+]
+DRONE_DEVICE_TYPE_LIST = [
+    value for name, value in _DEVICE_TYPES if not name.startswith("SKYCTRL")
+]
 
 
 DEVICE_TYPE_LIST = SKYCTRL_DEVICE_TYPE_LIST + DRONE_DEVICE_TYPE_LIST
 
 
 def _str_init(_input):
-    if isinstance(_input, bytes):
+    # od.string_cast already returns str, so this is the common case
+    if type(_input) is str:
+        return _input
+    elif isinstance(_input, bytes):
         return _input.decode('utf-8')
     else:
         return _input
@@ -89,6 +97,8 @@ class DeviceInfo:
         self.json = _str_init(json)
         self.arsdk_device = arsdk_device
         self.backend = backend
+        self._discovery_device_info = None
+        self._discovery_device_info_key = None
 
     def __repr__(self):
         return (f"<ArsdkDevice: serial='{self.serial}' ip={self.ip_addr} "
@@ -97,31 +107,39 @@ class DeviceInfo:
     @classmethod
     def from_arsdk_device(cls, backend, device):
         device_info = ctypes.POINTER(od.struct_arsdk_device_info)()
-        res = od.arsdk_device_get_info(device, ctypes.pointer(device_info))
+        res = od.arsdk_device_get_info(device, ctypes.byref(device_info))
         if res != 0:
             raise RuntimeError(f"Failed to get device info: {res}")
+        device_info = device_info.contents
         return DeviceInfo(
-            serial=od.string_cast(device_info.contents.id) or "",
-            name=od.string_cast(device_info.contents.name) or "",
-            device_type=int(device_info.contents.type),
-            ip_addr=od.string_cast(device_info.contents.addr) or "",
-            port=int(device_info.contents.port),
-            proto_v=int(getattr(device_info.contents, "proto_v", 1)),
-            state=DeviceState(device_info.contents.state),
-            json=od.string_cast(device_info.contents.json) or "",
+            serial=od.string_cast(device_info.id) or "",
+            name=od.string_cast(device_info.name) or "",
+            device_type=int(device_info.type),
+            ip_addr=od.string_cast(device_info.addr) or "",
+            port=int(device_info.port),
+            proto_v=int(getattr(device_info, "proto_v", 1)),
+            state=DeviceState(device_info.state),
+            json=od.string_cast(device_info.json) or "",
             arsdk_device=device,
             backend=backend,
         )
 
     def as_arsdk_discovery_device_info(self):
-        return od.struct_arsdk_discovery_device_info(
-            od.char_pointer_cast(self.name),
-            od.arsdk_device_type(self.type),
-            od.char_pointer_cast(self.ip_addr),
-            ctypes.c_uint16(self.port),
-            od.char_pointer_cast(self.serial),
-            ctypes.c_uint32(self.proto_v),
-        )
+        # The device info attributes may be updated after construction (see
+        # DiscoveryNetRaw), so the cached structure is keyed on their values.
+        # The structure keeps a reference to its string buffers.
+        key = (self.name, self.type, self.ip_addr, self.port, self.serial, self.proto_v)
+        if key != self._discovery_device_info_key:
+            self._discovery_device_info = od.struct_arsdk_discovery_device_info(
+                od.char_pointer_cast(self.name),
+                od.arsdk_device_type(self.type),
+                od.char_pointer_cast(self.ip_addr),
+                ctypes.c_uint16(self.port),
+                od.char_pointer_cast(self.serial),
+                ctypes.c_uint32(self.proto_v),
+            )
+            self._discovery_device_info_key = key
+        return self._discovery_device_info
 
 
 class PeerInfo:
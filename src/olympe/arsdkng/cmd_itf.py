@@ -28,6 +28,8 @@
 #  SUCH DAMAGE.
 
 import ctypes
+import functools
+import logging
 import olympe_deps as od
 import re
 
@@ -60,6 +62,21 @@ from olympe.concurrent import Future
 from olympe.log import LogMixin
 
 
+@functools.lru_cache(maxsize=None)
+def _arsdk_cmd_desc(name):
+    # The command descriptions are static libarsdk.so symbols
+    return ctypes.pointer(
+        od.struct_arsdk_cmd_desc.in_dll(od._libraries["libarsdk.so"], name)  # pylint: disable=E1101
+    )
+
+
+# command send statuses of successfully sent commands
+_SEND_STATUS_SUCCESS = frozenset((
+    od.ARSDK_CMD_ITF_CMD_SEND_STATUS_ACK_RECEIVED,
+    od.ARSDK_CMD_ITF_CMD_SEND_STATUS_PACKED,
+))
+
+
 class DisconnectedEvent(Event):
     pass
 
@@ -273,6 +290,8 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
             self.protobuf_messages[(service_id, message_id)] = message
 
         self._external_messages = OrderedDict()
+        # query_state messages argument names, computed on first use
+        self._query_state_names = None
 
         self._decoding_errors = []
 
@@ -329,7 +348,14 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
             self._cmd_itf_cmd_send_status_cb
         )
         self._send_status_userdata = {}
+        # recycled (py_object, pointer) send status userdata pairs
+        self._send_status_userdata_pool = []
         self._userdata = ctypes.c_void_p()
+        # Commands are encoded and sent from the pomp loop thread and
+        # arsdk_cmd_itf_send copies the command it is given: a single arsdk
+        # command structure is reused for every command sent.
+        self._cmd = od.struct_arsdk_cmd()
+        self._cmd_p = ctypes.pointer(self._cmd)
 
         self._cmd_itf_cbs = od.struct_arsdk_cmd_itf_cbs.bind(
             {
@@ -354,7 +380,8 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         Function called when an arsdk event message has been received.
         """
         message_id = command.contents.id
-        if message_id not in self.messages.keys():
+        message = self.messages.get(message_id)
+        if message is None:
             feature_name, class_name, msg_id = messages.ArsdkMessages.get(
                 "olympe"
             ).unknown_message_info(message_id)
@@ -367,7 +394,6 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
             else:
                 self.logger.warning(f"Unknown message id 0x{message_id:08x}")
             return
-        message = self.messages[message_id]
         try:
             res, message_args = message._decode_args(command)
         except Exception as e:
@@ -378,7 +404,7 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         if res != 0:
             msg = (
                 f"Unable to decode event, error: {res} , "
-                f"id: {command.contents.id} , name: {message.fullName}"
+                f"id: {message_id} , name: {message.fullName}"
             )
             self.logger.error(msg)
             self._decoding_errors.append(RuntimeError(msg))
@@ -461,7 +487,8 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         message._set_last_event(message_event)
 
         # Format received events as string
-        self.logger.log(message.loglevel, str(message_event))
+        if self.logger.isEnabledFor(message.loglevel):
+            self.logger.log(message.loglevel, str(message_event))
 
         # Update the currently monitored expectations
         self._scheduler.process_event(message_event)
@@ -543,15 +570,17 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         done = bool(done)
         send_status_userdata = py_object_cast(userdata)
         send_command_future, message, args = send_status_userdata
-        self.logger.debug(
-            f"Command send status: {message.fullName} {status_repr}, done: {done}"
-        )
-        if not done or send_command_future.done():
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                f"Command send status: {message.fullName} {status_repr}, done: {done}"
+            )
+        if not done:
             return
-        if status in (
-            od.ARSDK_CMD_ITF_CMD_SEND_STATUS_ACK_RECEIVED,
-            od.ARSDK_CMD_ITF_CMD_SEND_STATUS_PACKED,
-        ):
+        # this is the last send status notification for this command
+        self._release_send_status_userdata(send_command_future)
+        if send_command_future.done():
+            return
+        if status in _SEND_STATUS_SUCCESS:
             send_command_future.set_result(True)
         else:
             send_command_future.set_result(False)
@@ -559,7 +588,23 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
                 "Command send status cancel/timeout: "
                 f"{message.fullName} {status_repr}, done: {done}"
             )
-        del self._send_status_userdata[id(send_command_future)]
+
+    def _acquire_send_status_userdata(self, send_command_future, message, args):
+        if self._send_status_userdata_pool:
+            userdata = self._send_status_userdata_pool.pop()
+        else:
+            obj = ctypes.py_object()
+            userdata = (obj, ctypes.pointer(obj))
+        userdata[0].value = (send_command_future, message, args)
+        self._send_status_userdata[id(send_command_future)] = userdata
+        return userdata[1]
+
+    def _release_send_status_userdata(self, send_command_future):
+        userdata = self._send_status_userdata.pop(id(send_command_future), None)
+        if userdata is None:
+            return
+        userdata[0].value = None
+        self._send_status_userdata_pool.append(userdata)
 
     @callback_decorator()
     def _send_command_impl(self, message, args, quiet=False):
@@ -568,27 +613,29 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         """
 
         argv = message._encode_args(args)
+        return self._send_encoded_command(message, args, argv, quiet=quiet)
 
-        # Check if we are already sending a command.
-        # if it the case, wait for the lock to be released
-        # Define an Arsdk structure
-        cmd = od.struct_arsdk_cmd()
+    def _send_encoded_command(self, message, args, argv, quiet=False):
+        """
+        Send a command whose arguments have already been encoded into argv.
+        Must be run from the pomp loop
+        """
+
+        # Reset our Arsdk command structure
+        ctypes.memset(ctypes.addressof(self._cmd), 0, ctypes.sizeof(self._cmd))
+        cmd = self._cmd_p
 
         # Find the description of the command in libarsdk.so
-        command_desc = od.struct_arsdk_cmd_desc.in_dll(
-            od._libraries["libarsdk.so"], message.g_arsdk_cmd_desc
-        )  # pylint: disable=E1101
+        command_desc = _arsdk_cmd_desc(message.g_arsdk_cmd_desc)
 
         # argv is an array of struct_arsdk_value
         argc = argv._length_
         # Encode the command
-        res = od.arsdk_cmd_enc_argv(
-            ctypes.pointer(cmd), ctypes.pointer(command_desc), argc, argv
-        )
+        res = od.arsdk_cmd_enc_argv(cmd, command_desc, argc, argv)
 
         if res != 0:
             self.logger.error(f"Error while encoding command {message.fullName}: {res}")
-        else:
+        elif self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(f"Command {message.fullName} has been encoded")
 
         # cmd_itf must exist to send command
@@ -597,27 +644,25 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
 
         # Send the command
         send_command_future = Future(self._thread_loop)
-        send_status_userdata = ctypes.pointer(
-            ctypes.py_object((send_command_future, message, args))
+        send_status_userdata = self._acquire_send_status_userdata(
+            send_command_future, message, args
         )
-        self._send_status_userdata[id(send_command_future)] = send_status_userdata
         res = od.arsdk_cmd_itf_send(
-            self._cmd_itf, ctypes.pointer(cmd), self._send_status, send_status_userdata
+            self._cmd_itf, cmd, self._send_status, send_status_userdata
         )
 
         if res != 0:
             self.logger.error(f"Error while sending command: {res}")
+            self._release_send_status_userdata(send_command_future)
             send_command_future.set_result(False)
             return send_command_future
 
         event = ArsdkMessageEvent(message, args)
         # Update the currently monitored expectations
         self._scheduler.process_event(event)
-        log_msg = f"{event} has been sent to the device"
-        if quiet:
-            self.logger.debug(log_msg)
-        else:
-            self.logger.info(log_msg)
+        log_level = logging.DEBUG if quiet else logging.INFO
+        if self.logger.isEnabledFor(log_level):
+            self.logger.log(log_level, f"{event} has been sent to the device")
 
         return send_command_future
 
@@ -661,15 +706,15 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         """
         Returns a drone internal message object given its ID
         """
-        if isinstance(id_, tuple):
-            # protobuf messages
-            try:
-                return self.protobuf_messages[id_]
-            except KeyError:
-                return self._external_messages[id_]
-        else:
-            # standard arsdk messages
-            return self.messages[id_]
+        # standard arsdk messages
+        message = self.messages.get(id_)
+        if message is not None:
+            return message
+        # protobuf messages
+        try:
+            return self.protobuf_messages[id_]
+        except KeyError:
+            return self._external_messages[id_]
 
     def _send_protobuf_command(self, proto_message, proto_args, quiet=False):
         payload = proto_message._encode_args(proto_args)
@@ -690,13 +735,11 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
             self.logger.error(f"Error while sending command: {event}")
             return send_future
 
-        log_msg = f"{event} has been sent to the device"
         # Update the currently monitored expectations
         self._scheduler.process_event(event)
-        if quiet:
-            self.logger.debug(log_msg)
-        else:
-            self.logger.info(log_msg)
+        log_level = logging.DEBUG if quiet else logging.INFO
+        if self.logger.isEnabledFor(log_level):
+            self.logger.log(log_level, f"{event} has been sent to the device")
         return send_future
 
     def _send_command_raw(self, message, args, quiet=False):
@@ -821,15 +864,20 @@ class CommandInterfaceBase(LogMixin, AbstractScheduler):
         :param: query, the string to search for in the message received from the drone.
         """
         result = OrderedDict()
-        for message in self.messages.values():
-            if re.search(query, message.fullName, re.IGNORECASE):
+        query = re.compile(query, re.IGNORECASE)
+        if self._query_state_names is None:
+            self._query_state_names = [
+                (message, [message.fullName + "." + arg_name for arg_name in message.args_name])
+                for message in self.messages.values()
+            ]
+        for message, arg_names in self._query_state_names:
+            if query.search(message.fullName):
                 try:
                     result[message.fullName] = message.state()
                 except RuntimeError:
                     continue
-            for arg_name in message.args_name:
-                name = message.fullName + "." + arg_name
-                if re.search(query, name, re.IGNORECASE):
+            for name in arg_names:
+                if query.search(name):
                     try:
                         result[message.fullName] = message.state()
                     except RuntimeError:
@@ -30,7 +30,9 @@
 
 import ctypes
 import datetime
+import functools
 import json
+import logging
 import olympe_deps as od
 import pprint
 import time
@@ -65,13 +67,36 @@ from typing import List, Optional
 from warnings import warn
 
 
+@functools.lru_cache(maxsize=None)
+def _cancel_reason_str(reason):
+    return od.string_cast(od.arsdk_conn_cancel_reason_str(reason))
+
+
+@functools.lru_cache(maxsize=None)
+def _device_conn_cfg():
+    # The connection configuration is the same for every connection and
+    # keeps a reference to its string buffers.
+    # Use default values for connection json. If we want to changes values
+    # (or add new info), we just need to add them in req (using json format)
+    # For instance:
+    req = bytes('{{ "{}": "{}", "{}": "{}", "{}": "{}"}}'.format(
+        "arstream2_client_stream_port", PDRAW_LOCAL_STREAM_PORT,
+        "arstream2_client_control_port", PDRAW_LOCAL_CONTROL_PORT,
+        "arstream2_supported_metadata_version", "1"), 'utf-8')
+    device_id = b""
+
+    return od.struct_arsdk_device_conn_cfg(
+        ctypes.create_string_buffer(b"olympe"), ctypes.create_string_buffer(b"desktop"),
+        ctypes.create_string_buffer(bytes(device_id)), ctypes.create_string_buffer(req))
+
+
 class PilotingCommand:
     def __init__(self, time_function=None):
         self.set_default_piloting_command()
         if time_function:
             self.time_function = time_function
         else:
-            self.time_function = time.time
+            self.time_function = time.monotonic
 
     def update_piloting_command(self, roll, pitch, yaw, gaz, piloting_time):
         self.roll = roll
@@ -81,6 +106,9 @@ class PilotingCommand:
         self.piloting_time = piloting_time
         self.initial_time = self.time_function()
 
+    def is_neutral(self):
+        return not (self.roll or self.pitch or self.yaw or self.gaz)
+
     def set_default_piloting_command(self):
         self.roll = 0
         self.pitch = 0
@@ -102,6 +130,13 @@ class ControllerBase(CommandInterfaceBase):
 
     DEVICE_TYPES: Optional[List[int]] = None
 
+    # Piloting commands timer period (in milliseconds). Once the neutral
+    # piloting command has been sent `_piloting_idle_ticks` times in a row,
+    # the timer is slowed down to `_piloting_idle_period`.
+    _piloting_period = 25
+    _piloting_idle_period = 100
+    _piloting_idle_ticks = 8
+
     def __init__(self,
                  ip_addr,
                  *,
@@ -119,6 +154,7 @@ class ControllerBase(CommandInterfaceBase):
         self._ip_addr = ip_addr.encode('utf-8')
         self._is_skyctrl = is_skyctrl
         self._piloting = False
+        self._piloting_neutral_ticks = 0
         self._time_function = time_function
 
         self._piloting_command = PilotingCommand(
@@ -147,6 +183,14 @@ class ControllerBase(CommandInterfaceBase):
 
         self._connected_future = None
         self._last_disconnection_time = None
+        # PCMD arguments are encoded once and updated in place for each
+        # piloting command sent
+        self._pcmd_argv = ardrone3.Piloting.PCMD._encode_args(
+            self._pcmd_args(0, 0, 0, 0, 0))
+        self._pcmd_argv_data = [
+            (self._pcmd_argv[i].data, value_attr)
+            for i, value_attr in enumerate(ardrone3.Piloting.PCMD.arsdk_value_attr)
+        ]
         # Setup piloting commands timer
         self._piloting_timer = self._thread_loop.create_timer(
             self._piloting_timer_cb)
@@ -237,7 +281,8 @@ class ControllerBase(CommandInterfaceBase):
         json_info = od.string_cast(arsdk_device_info.contents.json)
         try:
             json_info = json.loads(json_info)
-            self.logger.info(pprint.pformat(json_info))
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(pprint.pformat(json_info))
         except ValueError:
             self.logger.error(f'json contents cannot be parsed: {json_info}')
 
@@ -281,8 +326,7 @@ class ControllerBase(CommandInterfaceBase):
         request.
         """
         device_name = od.string_cast(arsdk_device_info.contents.name)
-        reason = od.string_cast(
-            od.arsdk_conn_cancel_reason_str(reason))
+        reason = _cancel_reason_str(reason)
         self.logger.info(
             f"Connection to device: {device_name} has been canceled for reason: {reason}")
         if self._connect_future is not None and not self._connect_future.done():
@@ -303,7 +347,11 @@ class ControllerBase(CommandInterfaceBase):
         if status == od.ARSDK_LINK_STATUS_KO:
             # the device has been disconnected
             self.connected = False
-            self._thread_loop.run_later(self._on_device_removed)
+            # a flaky link may report KO several times before the device
+            # removal has been processed: only schedule it once
+            if not self._device_removal_pending:
+                self._device_removal_pending = True
+                self._thread_loop.run_later(self._on_device_removed)
 
     @callback_decorator()
     def _disconnection_impl(self):
@@ -351,8 +399,9 @@ class ControllerBase(CommandInterfaceBase):
     @callback_decorator()
     def _start_piloting_impl(self):
         delay = 100
-        period = 25
+        period = self._piloting_period
 
+        self._piloting_neutral_ticks = 0
         ok = self._thread_loop.set_timer(self._piloting_timer, delay, period)
 
         if ok:
@@ -366,9 +415,15 @@ class ControllerBase(CommandInterfaceBase):
     @callback_decorator()
     def _stop_piloting_impl(self):
 
-        # Stop the drone movements
+        # Stop the drone movements: send the neutral piloting command right
+        # away, the piloting timer won't be triggered again
         self._piloting_command.set_default_piloting_command()
-        time.sleep(0.1)
+        if self.connected:
+            try:
+                self._send_piloting_command()
+            except Exception:
+                # stopping piloting must not abort the device removal
+                self.logger.exception("Failed to send the neutral piloting command")
 
         ok = self._thread_loop.clear_timer(self._piloting_timer)
         if ok:
@@ -380,40 +435,74 @@ class ControllerBase(CommandInterfaceBase):
 
     @callback_decorator()
     def _piloting_timer_cb(self, timer, _user_data):
-        self.logger.debug(f"piloting timer callback: {timer}")
-        if self.connected:
-            self._send_piloting_command()
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"piloting timer callback: {timer}")
+        if not self.connected:
+            return
+        self._send_piloting_command()
+        if not self._piloting_command.is_neutral():
+            if self._piloting_neutral_ticks >= self._piloting_idle_ticks:
+                # This slowed down tick has run before _resume_piloting_timer:
+                # restore the piloting timer period here
+                self._thread_loop.set_timer(
+                    self._piloting_timer,
+                    self._piloting_period,
+                    self._piloting_period,
+                )
+            self._piloting_neutral_ticks = 0
+            return
+        self._piloting_neutral_ticks += 1
+        if self._piloting_neutral_ticks == self._piloting_idle_ticks:
+            # The drone has received the neutral piloting command, keep
+            # sending it at a lower rate until the next piloting command
+            self._thread_loop.set_timer(
+                self._piloting_timer,
+                self._piloting_idle_period,
+                self._piloting_idle_period,
+            )
+
+    @callback_decorator()
+    def _resume_piloting_timer(self):
+        if not self._piloting or self._piloting_neutral_ticks < self._piloting_idle_ticks:
+            return
+        self._piloting_neutral_ticks = 0
+        self._thread_loop.set_timer(self._piloting_timer, 1, self._piloting_period)
 
     def _send_piloting_command(self):
+        piloting_command = self._piloting_command
         # When piloting time is 0 => send default piloting commands
-        if self._piloting_command.piloting_time:
+        if piloting_command.piloting_time:
             # Check if piloting time since last pcmd order has been reached
-            diff_time = (
-                self._piloting_command.time_function() -
-                self._piloting_command.initial_time
-            )
-            if diff_time >= self._piloting_command.piloting_time:
-                self._piloting_command.set_default_piloting_command()
+            diff_time = piloting_command.time_function() - piloting_command.initial_time
+            if diff_time >= piloting_command.piloting_time:
+                piloting_command.set_default_piloting_command()
 
         # Flag to activate movement on roll and pitch. 1 activate, 0 deactivate
-        if self._piloting_command.roll or (
-            self._piloting_command.pitch
-        ):
+        if piloting_command.roll or piloting_command.pitch:
             activate_movement = 1
         else:
             activate_movement = 0
 
-        self._send_command_impl(
-            ardrone3.Piloting.PCMD,
-            dict(
-                flag=activate_movement,
-                roll=self._piloting_command.roll,
-                pitch=self._piloting_command.pitch,
-                yaw=self._piloting_command.yaw,
-                gaz=self._piloting_command.gaz,
-                timestampAndSeqNum=0,
-            ),
-            quiet=True,
+        args = self._pcmd_args(
+            activate_movement,
+            piloting_command.roll,
+            piloting_command.pitch,
+            piloting_command.yaw,
+            piloting_command.gaz,
+        )
+        for (data, value_attr), value in zip(self._pcmd_argv_data, args.values()):
+            setattr(data, value_attr, value)
+        self._send_encoded_command(ardrone3.Piloting.PCMD, args, self._pcmd_argv, quiet=True)
+
+    @staticmethod
+    def _pcmd_args(flag, roll, pitch, yaw, gaz):
+        return dict(
+            flag=flag,
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            gaz=gaz,
+            timestampAndSeqNum=0,
         )
 
     def start_piloting(self):
@@ -483,9 +572,16 @@ class ControllerBase(CommandInterfaceBase):
         :rtype: bool
 
         """
-        if not self.start_piloting():
+        # piloting commands are "latest wins": the piloting timer only reads
+        # the last update, so keep this path short for high rate callers
+        if not self._piloting and not self.start_piloting():
             return False
         self._piloting_command.update_piloting_command(roll, pitch, yaw, gaz, piloting_time)
+        if (
+            self._piloting_neutral_ticks >= self._piloting_idle_ticks
+            and not self._piloting_command.is_neutral()
+        ):
+            self._thread_loop.run_async(self._resume_piloting_timer)
         return True
 
     def piloting_pcmd(self, roll, pitch, yaw, gaz, piloting_time):
@@ -544,18 +640,7 @@ class ControllerBase(CommandInterfaceBase):
     @callback_decorator()
     def _connect_impl(self, deadline):
         self._connection_deadline = deadline
-        # Use default values for connection json. If we want to changes values
-        # (or add new info), we just need to add them in req (using json format)
-        # For instance:
-        req = bytes('{{ "{}": "{}", "{}": "{}", "{}": "{}"}}'.format(
-            "arstream2_client_stream_port", PDRAW_LOCAL_STREAM_PORT,
-            "arstream2_client_control_port", PDRAW_LOCAL_CONTROL_PORT,
-            "arstream2_supported_metadata_version", "1"), 'utf-8')
-        device_id = b""
-
-        device_conn_cfg = od.struct_arsdk_device_conn_cfg(
-            ctypes.create_string_buffer(b"olympe"), ctypes.create_string_buffer(b"desktop"),
-            ctypes.create_string_buffer(bytes(device_id)), ctypes.create_string_buffer(req))
+        device_conn_cfg = _device_conn_cfg()
 
         # Send connection command
         if self._connect_future is not None and not self._connect_future.done():
@@ -702,20 +787,24 @@ class ControllerBase(CommandInterfaceBase):
             if not res:
                 return False
 
-        # Get specific optional states
-        for state_command in get_state_commands:
+        # Get specific optional states: these requests are independent from
+        # each other, send them all before waiting for their results
+        state_futures = [
+            self._thread_loop.run_async(self._send_states_settings_cmd, state_command)
+            for state_command in get_state_commands
+        ]
+        for state_future in state_futures:
             timeout = self._connection_deadline - time.time() - 0.1
             if timeout < 0.0:
                 # There is no time wait for optional states
-                self._thread_loop.run_async(self._send_states_settings_cmd, state_command)
                 continue
             try:
                 res = await self._thread_loop.await_for(
-                    timeout,
-                    self._send_states_settings_cmd, state_command
+                    timeout, lambda state_future=state_future: state_future
                 )
             except FutureTimeoutError:
                 # Protobuf Command.GetState are optional
+                state_future.cancel()
                 continue
             if not res:
                 return False
@@ -775,6 +864,8 @@ class ControllerBase(CommandInterfaceBase):
 
     @callback_decorator()
     def _on_device_removed(self):
+        # a later link loss must schedule a new removal, even if this one fails
+        self._device_removal_pending = False
         if self._discovery:
             self._discovery.async_stop()
         if self._piloting:
@@ -791,4 +882,5 @@ class ControllerBase(CommandInterfaceBase):
         self._device_name = None
         self._discovery = None
         self._connected_future = None
+        self._device_removal_pending = False
         super()._reset_instance()
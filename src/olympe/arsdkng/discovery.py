@@ -30,22 +30,60 @@
 
 import concurrent.futures
 import ctypes
+import functools
 import logging
 import olympe_deps as od
 import queue
+import socket
+import struct
 import time
 import typing
 
 from . import DeviceInfo, DEVICE_TYPE_LIST
 from .backend import CtrlBackend, CtrlBackendNet, CtrlBackendMuxIp, DeviceHandler
-from olympe.concurrent import Future, Loop, TimeoutError, CancelledError
-from olympe.networking import TcpClient
+from olympe.concurrent import Event, Future, Loop, TimeoutError, CancelledError
+from olympe.networking import SocketContext, SocketKind, TcpClient
 from abc import ABC, abstractmethod
-from collections import OrderedDict
 from olympe.types import PointerType
 from olympe.utils import callback_decorator
 
 
+@functools.lru_cache(maxsize=8)
+def _discovery_cfg(device_types: typing.Tuple[int, ...]) -> od.struct_arsdk_discovery_cfg:
+    # The discovery configuration only references the device type array,
+    # so it can be shared between the discovery instances.
+    ctypes_device_type_list = (ctypes.c_int * len(device_types))(*device_types)
+    return od.struct_arsdk_discovery_cfg(
+        ctypes.cast(ctypes_device_type_list, od.POINTER_T(od.arsdk_device_type)),
+        len(ctypes_device_type_list),
+    )
+
+
+class _ProbeSocketCreationListener:
+    def socket_created(self, ctx: SocketContext, fd: int, kind: SocketKind):
+        if kind != SocketKind.client:
+            return
+        # The probe connection is closed as soon as it is established: reset
+        # it on close so that it doesn't linger in TIME_WAIT.
+        sock = socket.socket(fileno=fd)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        finally:
+            sock.detach()
+
+
+_ANAFI_DEVICE_TYPE = (od.ARSDK_DEVICE_TYPE_ANAFI4K, "ANAFI-{}".format(7 * "X"))
+_IP_ADDR_DEVICE_TYPES = {
+    "192.168.53.1": (od.ARSDK_DEVICE_TYPE_SKYCTRL_3, "Skycontroller 3"),
+    "192.168.42.1": _ANAFI_DEVICE_TYPE,
+    "192.168.43.1": _ANAFI_DEVICE_TYPE,
+}
+
+
+# queue.SimpleQueue is only available since Python 3.7
+_SimpleQueue = getattr(queue, "SimpleQueue", queue.Queue)
+
+
 class Discovery(ABC, DeviceHandler):
 
     timeout = 3.0
@@ -54,13 +92,17 @@ class Discovery(ABC, DeviceHandler):
         self._backend: CtrlBackend
         self._thread_loop: Loop
         self.logger: logging.Logger
-        self._devices: typing.Dict[str, DeviceInfo] = OrderedDict()
-        self._device_queue: "queue.Queue[DeviceInfo]" = queue.Queue()
+        self._devices: typing.Dict[str, DeviceInfo] = {}
+        self._devices_by_ptr: typing.Dict[int, DeviceInfo] = {}
+        self._device_queue: "queue.SimpleQueue[DeviceInfo]" = _SimpleQueue()
+        self._device_added_event = Event(loop=self._thread_loop)
+        # bound methods used by the device added callback
+        self._device_queue_put = self._device_queue.put_nowait
+        self._log_info = self.logger.info
 
-        self.userdata = ctypes.c_void_p()
         self.discovery = None
         if timeout is None:
-            timeout = Discovery.timeout
+            timeout = type(self).timeout
         self.timeout: float = timeout
         self.deadline: float = 0.0
 
@@ -72,6 +114,7 @@ class Discovery(ABC, DeviceHandler):
         if self.discovery is not None:
             self.logger.error(f"{self.discovery_name}: already running")
             return True
+        self._device_added_event.clear()
         self.discovery = self._create_discovery()
         if self.discovery is None:
             self.logger.error(
@@ -103,13 +146,13 @@ class Discovery(ABC, DeviceHandler):
         """
 
     @abstractmethod
-    def _stop_discovery(self):
+    def _stop_discovery(self, discovery):
         """
         Call the specific internal arsdk discovery object stop method
         """
 
     @abstractmethod
-    def _destroy_discovery(self):
+    def _destroy_discovery(self, discovery):
         """
         Destroy the internal arsdk (net, raw, ...) discovery object
         """
@@ -120,6 +163,8 @@ class Discovery(ABC, DeviceHandler):
             return f.result_or_cancel(timeout=self.timeout)
         except TimeoutError:
             self.logger.warning(f"{self.discovery_name}: Discovery start timedout")
+            # the arsdk discovery may already have been created and started
+            self.async_stop()
             return False
 
     def stop(self) -> bool:
@@ -130,11 +175,15 @@ class Discovery(ABC, DeviceHandler):
             self.logger.warning(f"{self.discovery_name}: Discovery stop timedout")
             return False
         finally:
-            self._devices = OrderedDict()
-            self._device_queue = queue.Queue()
+            self._devices.clear()
+            while True:
+                try:
+                    self._device_queue.get_nowait()
+                except queue.Empty:
+                    break
 
     def async_start(self) -> "Future":
-        self.deadline = time.time() + self.timeout
+        self.deadline = time.monotonic() + self.timeout
         return self._thread_loop.run_async(self._do_start)
 
     def async_stop(self) -> "Future":
@@ -144,15 +193,22 @@ class Discovery(ABC, DeviceHandler):
     def _do_stop(self) -> bool:
         ret = True
         self._backend.remove_device_handler(self)
-
-        if self.discovery is None:
+        # arsdk device pointers are not valid anymore once the discovery is stopped
+        self._devices_by_ptr.clear()
+
+        # detach the discovery object first so that a re-entrant call
+        # cannot stop/destroy it twice
+        discovery, self.discovery = self.discovery, None
+        # wake up the device consumers, if any
+        self._device_added_event.set()
+        if discovery is None:
             self.logger.debug(
                 f"{self.discovery_name}: No discovery instance to be stopped"
             )
             return True
 
         # stop currently running discovery
-        res = self._stop_discovery()
+        res = self._stop_discovery(discovery)
         if res != 0:
             self.logger.error(
                 f"{self.discovery_name}: Error while stopping discovery: {res}"
@@ -162,7 +218,7 @@ class Discovery(ABC, DeviceHandler):
             self.logger.debug(f"{self.discovery_name}: Discovery has been stopped")
 
         # then, destroy it
-        res = self._destroy_discovery()
+        res = self._destroy_discovery(discovery)
         if res != 0:
             ret = False
             self.logger.error(
@@ -173,7 +229,6 @@ class Discovery(ABC, DeviceHandler):
                 f"{self.discovery_name}: Discovery object has been destroyed"
             )
 
-        self.discovery = None
         return ret
 
     @callback_decorator()
@@ -187,11 +242,14 @@ class Discovery(ABC, DeviceHandler):
         Detected devices depends on discovery parameters
         """
         device = DeviceInfo.from_arsdk_device(self._backend, arsdk_device)
-        self.logger.info(
-            f"{self.discovery_name}: New device has been detected: '{device.name}'"
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self._log_info(
+                f"{self.discovery_name}: New device has been detected: '{device.name}'"
+            )
         self._devices[device.name] = device
-        self._device_queue.put_nowait(device)
+        self._devices_by_ptr[ctypes.cast(arsdk_device, ctypes.c_void_p).value] = device
+        self._device_queue_put(device)
+        self._device_added_event.set()
 
     @callback_decorator()
     def _device_removed_cb(
@@ -202,13 +260,18 @@ class Discovery(ABC, DeviceHandler):
         """
         Called when a device disappear from the discovery search
         """
-        device = DeviceInfo.from_arsdk_device(self._backend, arsdk_device)
+        device = self._devices_by_ptr.pop(
+            ctypes.cast(arsdk_device, ctypes.c_void_p).value, None
+        )
+        if device is None:
+            device = DeviceInfo.from_arsdk_device(self._backend, arsdk_device)
         self.logger.info(
             f"{self.discovery_name}: Device '{device.name}' has been removed"
         )
         name = device.name
         if name == "__all__":
             device_names = list(self._devices.keys())
+            self._devices_by_ptr.clear()
         elif name not in self._devices:
             self.logger.error(
                 f"{self.discovery_name}: Error while removing device from discovery: "
@@ -230,15 +293,27 @@ class Discovery(ABC, DeviceHandler):
         if not await self.async_start():
             self.logger.error("async_start false")
             return
-        while self.deadline > time.time():
+        while True:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                return
             try:
-                yield self._device_queue.get_nowait()
-            except queue.Empty:
+                if not await self._device_added_event.wait_for(remaining):
+                    return
+            except CancelledError:
+                await self.async_stop()
+                raise
+            if self.discovery is None:
+                # the discovery has been stopped
+                return
+            # Drain the devices discovered in the same burst before waiting again
+            while True:
                 try:
-                    await self._thread_loop.asleep(0.005)
-                except CancelledError:
-                    await self.async_stop()
-                    raise
+                    device = self._device_queue.get_nowait()
+                except queue.Empty:
+                    self._device_added_event.clear()
+                    break
+                yield device
 
     async def async_get_device_count(self, max_count: int) -> typing.List[DeviceInfo]:
         devices: typing.List[DeviceInfo] = []
@@ -292,11 +367,7 @@ class DiscoveryNet(Discovery):
         if device_types is None:
             device_types = DEVICE_TYPE_LIST
         self._device_types = device_types
-        ctypes_device_type_list = (ctypes.c_int * len(device_types))(*device_types)
-        self.discovery_cfg = od.struct_arsdk_discovery_cfg(
-            ctypes.cast(ctypes_device_type_list, od.POINTER_T(od.arsdk_device_type)),
-            len(ctypes_device_type_list),
-        )
+        self.discovery_cfg = _discovery_cfg(tuple(device_types))
         self.ip_addr = ip_addr
 
     def _create_discovery(self) -> PointerType[od.struct_arsdk_discovery_net]:
@@ -308,7 +379,7 @@ class DiscoveryNet(Discovery):
         res = od.arsdk_discovery_net_new(
             self._backend._info.arsdk_ctrl,
             self._backend._info.backend,
-            ctypes.pointer(self.discovery_cfg),
+            ctypes.byref(self.discovery_cfg),
             od.char_pointer_cast(self.ip_addr),
             ctypes.byref(discovery),
         )
@@ -320,11 +391,11 @@ class DiscoveryNet(Discovery):
     def _start_discovery(self) -> None:
         return od.arsdk_discovery_net_start(self.discovery)
 
-    def _stop_discovery(self) -> None:
-        return od.arsdk_discovery_net_stop(self.discovery)
+    def _stop_discovery(self, discovery) -> None:
+        return od.arsdk_discovery_net_stop(discovery)
 
-    def _destroy_discovery(self) -> None:
-        return od.arsdk_discovery_net_destroy(self.discovery)
+    def _destroy_discovery(self, discovery) -> None:
+        return od.arsdk_discovery_net_destroy(discovery)
 
 
 class DiscoveryNetRaw(Discovery):
@@ -337,12 +408,15 @@ class DiscoveryNetRaw(Discovery):
     This method should be considered as a fallback.
     """
 
+    probe_timeout = 0.5
+
     def __init__(
         self,
         backend: CtrlBackendNet,
         *,
         ip_addr: str,
         check_port: typing.Optional[bool] = True,
+        probe_timeout: typing.Optional[float] = None,
         timeout: typing.Optional[float] = None,
         **kwds,
     ):
@@ -352,6 +426,9 @@ class DiscoveryNetRaw(Discovery):
         self.logger = self._backend.logger
         super().__init__(timeout=timeout)
         self._check_port = check_port
+        if probe_timeout is None:
+            probe_timeout = type(self).probe_timeout
+        self.probe_timeout: float = probe_timeout
         devices = kwds.pop("devices", None)
         self._raw_devices = []
         if not devices:
@@ -361,7 +438,7 @@ class DiscoveryNetRaw(Discovery):
             if kwds:
                 self._raw_devices.append(DeviceInfo(ip_addr, **kwds))
 
-        id_ = str(id(self))[:7]
+        id_ = format((id(self) >> 4) & 0xFFFFFFF, "07x")
         for i, device in enumerate(self._raw_devices):
             # arsdk will refuse to discover the same device twice
             # so we need to have unique serial for each "discovered" drone
@@ -369,21 +446,30 @@ class DiscoveryNetRaw(Discovery):
 
             # simple heuristic to identify the device type from the IP address
             if device.type is None or device.type <= 0:
-                if device.ip_addr == "192.168.53.1":
-                    device.type = od.ARSDK_DEVICE_TYPE_SKYCTRL_3
-                    device.name = "Skycontroller 3"
-                elif device.ip_addr in (
-                    "192.168.42.1",
-                    "192.168.43.1",
-                ) or device.ip_addr.startswith("10.202.0."):
-                    device.type = od.ARSDK_DEVICE_TYPE_ANAFI4K
-                    device.name = "ANAFI-{}".format(7 * "X")
+                guess = _IP_ADDR_DEVICE_TYPES.get(device.ip_addr)
+                if guess is None and device.ip_addr.startswith("10.202.0."):
+                    guess = _ANAFI_DEVICE_TYPE
+                if guess is not None:
+                    device.type, device.name = guess
 
     async def _do_start(self) -> bool:
         if not await super()._do_start():
             return False
-        for device in self._raw_devices:
-            await self._add_device(device)
+        if not self._check_port:
+            devices = self._raw_devices
+        else:
+            # probe the devices concurrently
+            futures = [
+                self._thread_loop.run_async(self._probe_device, device)
+                for device in self._raw_devices
+            ]
+            devices = [
+                device
+                for device, future in zip(self._raw_devices, futures)
+                if await future
+            ]
+        # add the reachable devices to the "discovered" devices
+        self._do_add_devices(devices)
         return True
 
     def _create_discovery(self) -> PointerType[od.struct_arsdk_discovery]:
@@ -404,40 +490,56 @@ class DiscoveryNetRaw(Discovery):
     def _start_discovery(self) -> int:
         return od.arsdk_discovery_start(self.discovery)
 
-    def _stop_discovery(self) -> int:
-        return od.arsdk_discovery_stop(self.discovery)
-
-    def _destroy_discovery(self) -> int:
-        return od.arsdk_discovery_destroy(self.discovery)
+    def _stop_discovery(self, discovery) -> int:
+        return od.arsdk_discovery_stop(discovery)
 
-    async def _add_device(self, device: DeviceInfo) -> None:
-        if self._check_port:
-            timeout = self.deadline - time.time()
-            client = TcpClient(self._thread_loop)
-            try:
-                if not await client.aconnect(
-                    device.ip_addr, device.port, timeout=timeout
-                ):
-                    return
-            finally:
-                await client.adestroy()
-        # add this device to the "discovered" devices
-        self._do_add_device(device)
+    def _destroy_discovery(self, discovery) -> int:
+        return od.arsdk_discovery_destroy(discovery)
 
-    @callback_decorator()
-    def _do_add_device(self, device: DeviceInfo) -> None:
-        res = od.arsdk_discovery_add_device(
-            self.discovery, device.as_arsdk_discovery_device_info()
-        )
-        if res != 0:
-            self.logger.error(
-                f"{self.discovery_name}: arsdk_discovery_add_device {res}"
+    async def _probe_device(self, device: DeviceInfo) -> bool:
+        # devices on the local link answer in a few milliseconds, don't
+        # wait for the whole discovery timeout for an unreachable one
+        timeout = min(self.probe_timeout, self.deadline - time.monotonic())
+        if timeout <= 0:
+            self.logger.debug(
+                f"{self.discovery_name}: {device.ip_addr}:{device.port} "
+                "port probe skipped, discovery timedout"
             )
-        else:
+            return False
+        client = TcpClient(self._thread_loop)
+        client.add_socket_creation_listener(_ProbeSocketCreationListener())
+        # Loop.await_for doesn't cancel the coroutine it times out: keep the
+        # connection task to cancel it ourselves
+        connect = self._thread_loop.run_async(
+            client.aconnect, device.ip_addr, device.port
+        )
+        try:
+            return await self._thread_loop.await_for(timeout, lambda: connect)
+        except TimeoutError:
             self.logger.debug(
-                f"{self.discovery_name}: Device '{device.name}'/{device.ip_addr}"
-                " manually added to raw discovery"
+                f"{self.discovery_name}: {device.ip_addr}:{device.port} "
+                "port probe timedout"
+            )
+            return False
+        finally:
+            connect.cancel()
+            await client.adestroy()
+
+    @callback_decorator()
+    def _do_add_devices(self, devices: typing.List[DeviceInfo]) -> None:
+        for device in devices:
+            res = od.arsdk_discovery_add_device(
+                self.discovery, device.as_arsdk_discovery_device_info()
             )
+            if res != 0:
+                self.logger.error(
+                    f"{self.discovery_name}: arsdk_discovery_add_device {res}"
+                )
+            else:
+                self.logger.debug(
+                    f"{self.discovery_name}: Device '{device.name}'/{device.ip_addr}"
+                    " manually added to raw discovery"
+                )
 
 
 class DiscoveryMux(Discovery):
@@ -456,11 +558,7 @@ class DiscoveryMux(Discovery):
         if device_types is None:
             device_types = DEVICE_TYPE_LIST
         self._device_types = device_types
-        ctypes_device_type_list = (ctypes.c_int * len(device_types))(*device_types)
-        self.discovery_cfg = od.struct_arsdk_discovery_cfg(
-            ctypes.cast(ctypes_device_type_list, od.POINTER_T(od.arsdk_device_type)),
-            len(ctypes_device_type_list),
-        )
+        self.discovery_cfg = _discovery_cfg(tuple(device_types))
 
     def _create_discovery(self) -> PointerType[od.struct_arsdk_discovery_mux]:
         """
@@ -471,7 +569,7 @@ class DiscoveryMux(Discovery):
         res = od.arsdk_discovery_mux_new(
             self._backend._info.arsdk_ctrl,
             self._backend._info.backend,
-            ctypes.pointer(self.discovery_cfg),
+            ctypes.byref(self.discovery_cfg),
             self._backend._info.mux_ctx,
             ctypes.byref(discovery),
         )
@@ -483,11 +581,11 @@ class DiscoveryMux(Discovery):
     def _start_discovery(self) -> int:
         return od.arsdk_discovery_mux_start(self.discovery)
 
-    def _stop_discovery(self) -> int:
-        return od.arsdk_discovery_mux_stop(self.discovery)
+    def _stop_discovery(self, discovery) -> int:
+        return od.arsdk_discovery_mux_stop(discovery)
 
-    def _destroy_discovery(self) -> int:
-        return od.arsdk_discovery_mux_destroy(self.discovery)
+    def _destroy_discovery(self, discovery) -> int:
+        return od.arsdk_discovery_mux_destroy(discovery)
 
 
 if __name__ == "__main__":
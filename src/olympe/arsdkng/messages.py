@@ -337,12 +337,21 @@ class ArsdkMessageMeta(type):
             else argname
             for argname in cls.args_name + ["**kwds"]
         )
-        cls.decoded_args = list(
-            map(lambda ctype: ctypes.pointer(ctype()), cls.decode_ctypes_args)
-        )
+        # arsdk_cmd_dec output arguments: keep a reference to the pointed
+        # values so that decoding doesn't have to dereference the pointers
+        cls.decoded_args_values = list(map(lambda ctype: ctype(), cls.decode_ctypes_args))
+        cls.decoded_args = list(map(ctypes.pointer, cls.decoded_args_values))
         cls.decoded_args_type = list(
             map(lambda ctype: ctypes.POINTER(ctype), cls.decode_ctypes_args)
         )
+        # arsdk_cmd_dec is variadic: use a private function object with this
+        # message output arguments types rather than updating the prototype
+        # of the shared olympe_deps function object before each call
+        cls.arsdk_cmd_dec = od._libraries["libarsdk.so"]["arsdk_cmd_dec"]
+        cls.arsdk_cmd_dec.restype = od.arsdk_cmd_dec.restype
+        cls.arsdk_cmd_dec.argtypes = (
+            tuple(od.arsdk_cmd_dec.argtypes[:2]) + tuple(cls.decoded_args_type)
+        )
 
         # docstring
         cls.doc_todos = ""
@@ -817,6 +826,7 @@ class ArsdkMessage(ArsdkMessageBase, metaclass=ArsdkMessageMeta):
         other = self.new()
         other._last_event = self._last_event
         other._state = self._state.copy()
+        other._state_next_pos = self._state_next_pos
         return other
 
     @classmethod
@@ -900,12 +910,15 @@ class ArsdkMessage(ArsdkMessageBase, metaclass=ArsdkMessageMeta):
                 )
             )
 
-        event_list_flags = event.args.get("list_flags") or []
-
-        if self.callback_type == ArsdkMessageCallbackType.STANDARD:
+        if self.callback_type is ArsdkMessageCallbackType.STANDARD:
+            # most common case: the last event simply replaces the state
             self._last_event = event
             self._state = event.args
-        elif self.callback_type == ArsdkMessageCallbackType.MAP:
+            return
+
+        event_list_flags = event.args.get("list_flags") or []
+
+        if self.callback_type == ArsdkMessageCallbackType.MAP:
             if self._last_event is None:
                 self._last_event = OrderedDict()
             key = event.args[self.key_name]
@@ -925,13 +938,15 @@ class ArsdkMessage(ArsdkMessageBase, metaclass=ArsdkMessageMeta):
         elif self.callback_type == ArsdkMessageCallbackType.LIST:
             if not event_list_flags or event.args["list_flags"] == [list_flags.Last]:
                 # append to the current list
-                insert_pos = next(reversed(self._state), -1) + 1
-                self._state[insert_pos] = event.args
+                self._state[self._state_next_pos] = event.args
+                self._state_next_pos += 1
             if list_flags.First in event_list_flags:
                 self._state = OrderedDict()
                 self._state[0] = event.args
+                self._state_next_pos = 1
             if list_flags.Empty in event_list_flags:
                 self._state = OrderedDict()
+                self._state_next_pos = 0
             if list_flags.Remove in event_list_flags:
                 # remove the received element from the current list
                 for k, v in self._state:
@@ -954,6 +969,8 @@ class ArsdkMessage(ArsdkMessageBase, metaclass=ArsdkMessageMeta):
     def _reset_state(self):
         self._last_event = None
         self._state = OrderedDict()
+        # next LIST message state index
+        self._state_next_pos = 0
 
     def _expect_args(cls, *args, **kwds):
         default_timeout = (
@@ -1187,20 +1204,16 @@ class ArsdkMessage(ArsdkMessageBase, metaclass=ArsdkMessageMeta):
         Decode a ctypes message buffer into a list of python typed arguments. This also perform the
         necessary enum, bitfield and unicode conversions.
         """
-        od.arsdk_cmd_dec.argtypes = (
-            od.arsdk_cmd_dec.argtypes[:2] + cls.decoded_args_type
-        )
-
-        res = od.arsdk_cmd_dec(message_buffer, cls.arsdk_desc, *cls.decoded_args)
+        res = cls.arsdk_cmd_dec(message_buffer, cls.arsdk_desc, *cls.decoded_args)
 
         decoded_args = cls.decoded_args[:]
-        for i, (name, arg) in enumerate(zip(cls.args_name, decoded_args)):
+        for i, (name, value) in enumerate(zip(cls.args_name, cls.decoded_args_values)):
             # ctypes -> python type conversion (exception: arsdk_binary -> c_char array)
-            if not isinstance(arg.contents, od.struct_arsdk_binary):
-                decoded_args[i] = arg = arg.contents.value
+            if not isinstance(value, od.struct_arsdk_binary):
+                decoded_args[i] = arg = value.value
             else:
-                decoded_args[i] = arg = (ctypes.c_char * arg.contents.len).from_address(
-                    arg.contents.cdata
+                decoded_args[i] = arg = (ctypes.c_char * value.len).from_address(
+                    value.cdata
                 )
             # bytes utf-8 -> str conversion
             if isinstance(arg, bytes):
@@ -142,6 +142,30 @@ class Event(_LoopBoundMixin):
         finally:
             self._waiters.remove(fut)
 
+    async def wait_for(self, timeout):
+        """Block until the internal flag is true or until `timeout` seconds
+        have elapsed.
+
+        Return True if the internal flag is true, False on timeout.
+        """
+        if self._value:
+            return True
+
+        loop = self._get_loop()
+        fut = Future(loop)
+        self._waiters.append(fut)
+        timer = loop.run_delayed(timeout, self._timeout_waiter, fut)
+        try:
+            return await fut
+        finally:
+            timer.cancel()
+            self._waiters.remove(fut)
+
+    @staticmethod
+    def _timeout_waiter(fut):
+        if not fut.done():
+            fut.set_result(False)
+
 
 class Condition(_LoopBoundMixin):
     def __init__(self, loop=None, lock=None):
@@ -40,7 +40,7 @@ from collections import OrderedDict
 from concurrent.futures import TimeoutError as FutureTimeoutError
 from logging import getLogger
 from typing import Optional
-from .concurrent import Future
+from .concurrent import Event, Future
 from .event_marker import EventMarker
 from .event import EventContext, MultipleEventContext
 
@@ -60,6 +60,7 @@ class ExpectationBase(ABC):
 
     always_monitor = False
     _eventloop_future_blocking = False
+    _wait_max_period = 0.1
 
     def __init__(self, future=None):
         if future is None:
@@ -110,18 +111,28 @@ class ExpectationBase(ABC):
         return self
 
     async def _wait_future(self, _timeout=None):
+        loop = self._scheduler.expectation_loop
         deadline = None
         if _timeout is not None:
             deadline = self._scheduler.time() + _timeout
+        # Wake up as soon as the expectation is done instead of polling it
+        done = Event(loop=loop)
+        self._future.add_done_callback(lambda _: loop.run_async(done.set))
         while True:
-            await self._scheduler.expectation_loop.asleep(0.005)
             if self._future.done():
                 if self._future.cancelled():
                     self.cancel()
                 return self
-            if deadline is not None and self._scheduler.time() > deadline:
+            if deadline is None:
+                await done.wait()
+                continue
+            remaining = deadline - self._scheduler.time()
+            if remaining < 0:
                 self.set_timedout()
                 return self
+            # The scheduler time function may not be the wall clock time:
+            # re-check the deadline at least every `_wait_max_period`
+            await done.wait_for(min(remaining, self._wait_max_period))
 
     def add_done_callback(self, cb):
         self._future.add_done_callback(lambda f: cb(self))
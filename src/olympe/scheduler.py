@@ -34,7 +34,7 @@ from types import SimpleNamespace
 
 from olympe.expectations import MultipleExpectation
 from olympe.subscriber import Subscriber
-from olympe.concurrent import Loop
+from olympe.concurrent import Event, Loop
 from olympe.utils import callback_decorator, timestamp_now
 
 import functools
@@ -81,6 +81,11 @@ class DefaultScheduler(AbstractScheduler):
 
     __slots__ = "_attr"
 
+    # expectations timeout monitoring period (in seconds) when some
+    # expectations are pending and when there is none
+    _gc_period = 0.015
+    _gc_idle_period = 0.5
+
     def __init__(self, pomp_loop_thread, name=None, device_name=None):
         self._attr = SimpleNamespace()
         self._attr.default = SimpleNamespace()
@@ -100,13 +105,17 @@ class DefaultScheduler(AbstractScheduler):
 
         # Expectations internal state
         self._attr.default.contexts = OrderedDict()
-        self._attr.default.pending_expectations = []
+        # pending expectations indexed by their id (insertion ordered)
+        self._attr.default.pending_expectations = OrderedDict()
         self._attr.default.pomp_loop_thread = pomp_loop_thread
+        self._attr.default.expectation_scheduled = Event(loop=pomp_loop_thread)
+        self._attr.default.expectations_collected = False
 
         # Setup expectations timeout monitoring
         self._attr.default.pomp_loop_thread.run_delayed(0.2, self._garbage_collect)
 
         # Subscribers internal state
+        self._attr.default.pending_events = deque()
         self._attr.default.subscribers_lock = threading.RLock()
         self._attr.default.subscribers = []
         self._attr.default.running_subscribers = defaultdict(set)
@@ -175,7 +184,8 @@ class DefaultScheduler(AbstractScheduler):
         expectation._schedule(self)
         monitor = kwds.get("monitor", True)
         if monitor and not expectation.success():
-            self._attr.default.pending_expectations.append(expectation)
+            self._attr.default.pending_expectations[id(expectation)] = expectation
+            self._attr.default.expectation_scheduled.set()
 
     def process_event(self, event):
         self._attr.default.pomp_loop_thread.run_async(self._process_event, event)
@@ -183,47 +193,72 @@ class DefaultScheduler(AbstractScheduler):
     @callback_decorator()
     def _process_event(self, event):
         # For all current pending expectations
-        garbage_collected_expectations = set()
-        for expectation in self._attr.default.pending_expectations:
+        pending_expectations = self._attr.default.pending_expectations
+        garbage_collected_expectations = []
+        for key, expectation in list(pending_expectations.items()):
             if expectation.cancelled() or expectation.timedout():
                 # Garbage collect canceled/timedout expectations
-                garbage_collected_expectations.add(expectation)
+                garbage_collected_expectations.append(key)
             elif expectation.check(event).success():
                 # If an expectation successfully matched a message, signal the expectation
                 # and remove it from the currently monitored expectations.
                 expectation.set_success()
-                garbage_collected_expectations.add(expectation)
+                garbage_collected_expectations.append(key)
         # Remove the garbage collected expectations
-        for expectation in garbage_collected_expectations:
-            try:
-                self._attr.default.pending_expectations.remove(expectation)
-            except ValueError:
-                pass
-
-        # Notify subscribers
-        self._attr.default.pomp_loop_thread.run_later(self._notify_subscribers, event)
+        for key in garbage_collected_expectations:
+            pending_expectations.pop(key, None)
+        self._attr.default.expectations_collected = True
+
+        # Notify subscribers (all the events processed during this pomp loop
+        # iteration are notified at once)
+        self._attr.default.pending_events.append(event)
+        if len(self._attr.default.pending_events) == 1:
+            self._attr.default.pomp_loop_thread.run_later(self._notify_pending_events)
+
+    def _notify_pending_events(self):
+        events = self._attr.default.pending_events
+        self._attr.default.pending_events = deque()
+        with self._attr.default.subscribers_lock:
+            for event in events:
+                try:
+                    self._notify_subscribers(event)
+                except Exception:
+                    # already logged by the callback decorator
+                    pass
 
     async def _garbage_collect(self):
         while self._attr.default.pomp_loop_thread.running:
             # For all currently pending expectations
-            garbage_collected_expectations = []
-            for expectation in self._attr.default.pending_expectations:
-                # Collect cancelled or timedout expectation
-                # The actual cancel/timeout check is delegated to the expectation
-                if expectation.cancelled() or expectation.timedout():
-                    garbage_collected_expectations.append(expectation)
+            pending_expectations = self._attr.default.pending_expectations
+            if not pending_expectations:
+                # Nothing to monitor: sleep until the next expectation is
+                # scheduled (or periodically to check if we are still running)
+                self._attr.default.expectation_scheduled.clear()
+                await self._attr.default.expectation_scheduled.wait_for(
+                    self._gc_idle_period
+                )
+                continue
+            if self._attr.default.expectations_collected:
+                # All pending expectations have already been checked by
+                # _process_event since the last garbage collection
+                self._attr.default.expectations_collected = False
+                await self._attr.default.pomp_loop_thread.asleep(self._gc_period)
+                continue
+            # Collect cancelled or timedout expectation
+            # The actual cancel/timeout check is delegated to the expectation
+            garbage_collected_expectations = [
+                key for key, expectation in list(pending_expectations.items())
+                if expectation.cancelled() or expectation.timedout()
+            ]
             # Remove the collected expectations
-            for expectation in garbage_collected_expectations:
-                try:
-                    self._attr.default.pending_expectations.remove(expectation)
-                except ValueError:
-                    pass
-            await self._attr.default.pomp_loop_thread.asleep(0.015)
+            for key in garbage_collected_expectations:
+                pending_expectations.pop(key, None)
+            await self._attr.default.pomp_loop_thread.asleep(self._gc_period)
 
     def stop(self):
-        for expectation in self._attr.default.pending_expectations:
+        for expectation in list(self._attr.default.pending_expectations.values()):
             expectation.cancel()
-        self._attr.default.pending_expectations = []
+        self._attr.default.pending_expectations = OrderedDict()
         self._attr.default.subscribers_thread_loop.stop()
 
     def destroy(self):
@@ -86,12 +86,9 @@ class decorator(metaclass=FuncDecoratorMeta):
 
     @functools.lru_cache(maxsize=None)
     def __get__(self, obj, owner=None):
-        return functools.wraps(self._f)(
-            lambda *args, **kwds: self._method_call(obj, *args, **kwds)
-        )
-
-    def _method_call(self, this, *args, **kwds):
-        return self.__call__(this, *args, **kwds)
+        # Decorated methods are mostly used as C callbacks: bind the instance
+        # with a partial object rather than with a Python level trampoline.
+        return functools.wraps(self._f)(functools.partial(self.__call__, obj))
 
 
 class callback_decorator(decorator):
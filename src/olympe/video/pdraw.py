@@ -913,12 +913,13 @@ class Pdraw(LogMixin):
         id_ = py_object_cast(userdata)
         self.logger.debug(f"media id = {id_}")
 
-        if id_ not in self.streams:
+        stream = self.streams.get(id_)
+        if stream is None:
             self.logger.error(f"Received queue event from unknown ID {id_}")
             return
 
         # acknowledge event
-        res = od.pomp_evt_clear(self.streams[id_]["video_queue_event"])
+        res = od.pomp_evt_clear(stream["video_queue_event"])
         if res != 0:
             self.logger.error(
                 f"Unable to clear frame received event: {os.strerror(-res)}"
@@ -929,7 +930,7 @@ class Pdraw(LogMixin):
             return
 
         # process all available buffers in the queue
-        with self.streams[id_]["video_sink_lock"]:
+        with stream["video_sink_lock"]:
             while self._process_stream(id_):
                 pass
 
@@ -954,7 +955,8 @@ class Pdraw(LogMixin):
         return mbuf_video_frame
 
     def _process_stream(self, id_):
-        self.logger.debug(f"media id = {id_}")
+        # called for every frame of the stream: the media id has already been
+        # logged by _video_sink_queue_event
         mbuf_video_frame = self._pop_stream_buffer(id_)
         if not mbuf_video_frame:
             return False